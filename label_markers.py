@@ -127,7 +127,6 @@ if __name__ == "__main__":
                 with_tapir=False,
             )
             tracking_files.append(rf"{images_dir}{os.sep}t" + f"racking_config.json")
-            camera.stop_index = 5
             count = 0
             if delete_old_data and os.path.isfile(f"{images_dir}{os.sep}markers_kalman.bio"):
                 os.remove(f"{images_dir}{os.sep}markers_kalman.bio")
@@ -157,9 +156,8 @@ if __name__ == "__main__":
                     print(camera.frame_idx)
                     print(time.time() - tic)
                 if camera.frame_idx == len(camera.color_images) - 1 or camera.frame_idx == camera.stop_index - 1:
-                    cv2.destroyAllWindows()
+                    camera.stop_display()
                     break
-                cv2.waitKey(1)
 
         # # -------- decoment these lines to see poind cloud and 3d markers --------
         # import open3d as o3d
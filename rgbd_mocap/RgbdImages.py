@@ -10,12 +10,14 @@ except ImportError:
 import json
 import glob
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Union
 from biosiglive import load, InverseKinematicsMethods, MskFunctions
 import cv2
 from .enums import *
 import time
 from .marker_class import MarkerSet
+from .display import DisplayThread
 from .utils import *
 
 try:
@@ -51,6 +53,8 @@ class RgbdImages:
         stop_index: int = None,
         downsampled: int = 1,
         load_all_dir: bool = False,
+        preload: bool = False,
+        transcode: bool = False,
     ):
         """
         Initialize the camera and the images parameters
@@ -74,6 +78,12 @@ class RgbdImages:
         conf_file: str
             Path to the json file containing the camera configuration which was used to record the images.
             Only used if the images comes from a file and not a live stream.
+        preload: bool
+            If True and the images come from a directory, all the frames of the range are decoded once
+            and stacked in contiguous arrays so that getting a frame is a simple index.
+        transcode: bool
+            If True and preload is True, the decoded stacks are saved next to the dataset as raw .npy
+            files the first time and memory-mapped afterwards, removing the PNG decode entirely.
 
         """
         self.frame = None
@@ -92,6 +102,9 @@ class RgbdImages:
         self.color_dist_coeffs = None
         self.depth_dist_coeffs = None
         self.depth_scale = None
+        self._rs_intrinsics = {}
+        self._u_norm = None
+        self._v_norm = None
         self.frame_idx = 0
         self.optical_flow_params = None
         self.blobs = []
@@ -103,6 +116,9 @@ class RgbdImages:
         self.time_to_get_frame = -1
         self.camera_frame_numbers = []
         self.last_pos = []
+        self.show_every = 1
+        self._display_thread = None
+        self._display_bufs = []
 
         # Camera extrinsic
         self.depth_to_color = None
@@ -171,6 +187,17 @@ class RgbdImages:
         self.color_images, self.depth_images = self._load_from_dir(
             images_dir, self.start_index, self.stop_index, self.downsampled, load_all_dir
         )
+        self.preload = preload
+        self._color_stack = None
+        self._depth_stack = None
+        self._loader = None
+        self._prefetch = None
+        self._prefetch_idx = None
+        if preload and images_dir:
+            if transcode:
+                self._transcode_dataset()
+            else:
+                self._preload_frames()
         self.static_markers = []
 
     @staticmethod
@@ -239,6 +266,54 @@ class RgbdImages:
         ]
         return color_images, depth_images
 
+    def _decode_frame_stacks(self):
+        """
+        Decode every frame of the configured range and stack them in contiguous arrays.
+        """
+        color_files = self.all_color_files[self.start_index : self.stop_index]
+        depth_files = self.all_depth_files[self.start_index : self.stop_index]
+        first_color = cv2.imread(color_files[0])
+        first_depth = cv2.imread(depth_files[0], cv2.IMREAD_ANYDEPTH)
+        color_stack = aligned_empty((len(color_files),) + first_color.shape, first_color.dtype)
+        depth_stack = aligned_empty((len(depth_files),) + first_depth.shape, first_depth.dtype)
+        color_stack[0] = first_color
+        depth_stack[0] = first_depth
+        for i in range(1, len(color_files)):
+            color_stack[i] = cv2.imread(color_files[i])
+            depth_stack[i] = cv2.imread(depth_files[i], cv2.IMREAD_ANYDEPTH)
+        return color_stack, depth_stack
+
+    def _read_frame_files(self, frame_idx):
+        """
+        Decode the color and depth files of one frame index.
+        """
+        file_idx = self.start_index + frame_idx
+        color = cv2.imread(self.all_color_files[file_idx])
+        depth = cv2.imread(self.all_depth_files[file_idx], cv2.IMREAD_ANYDEPTH)
+        return color, depth
+
+    def _preload_frames(self):
+        """
+        Decode every frame of the configured range once and stack them in contiguous
+        arrays so that getting a frame is a simple index instead of a PNG decode.
+        """
+        self._color_stack, self._depth_stack = self._decode_frame_stacks()
+
+    def _transcode_dataset(self):
+        """
+        Transcode the PNG dataset to raw .npy stacks once, so that this run and the
+        following ones can memory-map the frames instead of decoding PNGs.
+        """
+        suffix = f"{self.start_index}_{self.stop_index}.npy"
+        color_path = os.path.join(self.image_dir, f"color_stack_{suffix}")
+        depth_path = os.path.join(self.image_dir, f"depth_stack_{suffix}")
+        if not os.path.isfile(color_path) or not os.path.isfile(depth_path):
+            color_stack, depth_stack = self._decode_frame_stacks()
+            np.save(color_path, color_stack)
+            np.save(depth_path, depth_stack)
+        self._color_stack = np.load(color_path, mmap_mode="r")
+        self._depth_stack = np.load(depth_path, mmap_mode="r")
+
     def init_camera(
         self,
         color_size: Union[tuple, ColorResolution],
@@ -311,7 +386,7 @@ class RgbdImages:
         self.intrinsics_depth_mat = np.array(
             [
                 [self.depth_fx_fy[0], 0, self.depth_ppx_ppy[0]],
-                [0, self.depth_fx_fy[1], self.depth_ppx_ppy[0]],
+                [0, self.depth_fx_fy[1], self.depth_ppx_ppy[1]],
                 [0, 0, 1],
             ],
             dtype=float,
@@ -319,11 +394,15 @@ class RgbdImages:
         self.intrinsics_color_mat = np.array(
             [
                 [self.color_fx_fy[0], 0, self.color_ppx_ppy[0]],
-                [0, self.color_fx_fy[1], self.color_ppx_ppy[0]],
+                [0, self.color_fx_fy[1], self.color_ppx_ppy[1]],
                 [0, 0, 1],
             ],
             dtype=float,
         )
+        self.depth_inv_fx_fy = [1 / self.depth_fx_fy[0], 1 / self.depth_fx_fy[1]]
+        self._rs_intrinsics = {}
+        self._u_norm = None
+        self._v_norm = None
 
     def _set_extrinsic_from_file(self):
         self.depth_to_color = np.eye(4)
@@ -389,9 +468,19 @@ class RgbdImages:
             self.color_frame = np.asanyarray(self.color_frame.get_data())
             self.camera_frame_numbers.append(self.color_frame.get_frame_number())
         elif self.color_images and self.depth_images:
-            if self.load_all_dir:
+            if self._color_stack is not None:
+                if self.frame_idx == len(self._color_stack) - 1:
+                    self.frame_idx = 0
+                    self.stop_display()
+                    print("starting over...")
+                self.color_frame, self.depth_frame = (
+                    self._color_stack[self.frame_idx],
+                    self._depth_stack[self.frame_idx],
+                )
+            elif self.load_all_dir:
                 if self.frame_idx == len(self.all_color_files) - 1:
                     self.frame_idx = 0
+                    self.stop_display()
                     print("starting over...")
                 self.color_frame, self.depth_frame = (
                     self.color_images[self.frame_idx],
@@ -400,14 +489,20 @@ class RgbdImages:
             else:
                 if self.frame_idx == self.stop_index - 1:
                     self.frame_idx = 0
+                    self.stop_display()
                     print("starting over...")
-                self.color_frame, self.depth_frame = self._load_from_dir(
-                    start_index=self.start_index + self.frame_idx,
-                    all_color_files=self.all_color_files,
-                    all_depth_files=self.all_depth_files,
-                )
-                self.color_frame = self.color_frame[0]
-                self.depth_frame = self.depth_frame[0]
+                if self._prefetch is not None and self._prefetch_idx == self.frame_idx:
+                    self.color_frame, self.depth_frame = self._prefetch.result()
+                else:
+                    self.color_frame, self.depth_frame = self._read_frame_files(self.frame_idx)
+                # decode the next frame in the background while this one is processed
+                next_idx = self.frame_idx + 1
+                if next_idx == self.stop_index - 1:
+                    next_idx = 0
+                if self._loader is None:
+                    self._loader = ThreadPoolExecutor(max_workers=1)
+                self._prefetch_idx = next_idx
+                self._prefetch = self._loader.submit(self._read_frame_files, next_idx)
 
             if self.is_frame_aligned:
                 self.depth_frame = self._align_images(self.color_frame, self.depth_frame)
@@ -510,18 +605,43 @@ class RgbdImages:
                     use_tapir=self.use_tapir,
                 )
 
+            blobs_to_draw = self.blobs[i] if len(self.blobs) != 0 and len(self.blobs[i]) != 0 else None
             if not fit_model:
-                color_list[i] = draw_markers(
-                    self.color_cropped[i],
+                draw_overlays(
+                    color_list[i],
                     markers_pos=self.marker_sets[i].get_markers_pos(),
                     markers_names=self.marker_sets[i].marker_names,
                     is_visible=self.marker_sets[i].get_markers_occlusion(),
                     scaling_factor=0.5,
                     markers_reliability_index=self.marker_sets[i].get_markers_reliability_index(self.frame_idx),
+                    blobs=blobs_to_draw,
                 )
-            if len(self.blobs) != 0:
-                if len(self.blobs[i]) != 0:
-                    color_list[i] = draw_blobs(color_list[i], self.blobs[i])
+            elif blobs_to_draw is not None:
+                draw_blobs(color_list[i], blobs_to_draw)
+
+    def _get_display_buf(self, i, color):
+        """
+        Copy the cropped frame into a reusable per-crop scratch buffer instead of
+        allocating a fresh copy every frame. cv2.imshow copies internally, so the
+        buffer can be reused across frames safely.
+        """
+        while len(self._display_bufs) <= i:
+            self._display_bufs.append(None)
+        buf = self._display_bufs[i]
+        if buf is None or buf.shape != color.shape or buf.dtype != color.dtype:
+            buf = np.empty_like(color)
+            self._display_bufs[i] = buf
+        np.copyto(buf, color)
+        return buf
+
+    def stop_display(self):
+        """
+        Close the display window and join the display thread. A new thread is
+        started lazily if frames are shown again afterwards.
+        """
+        if self._display_thread is not None:
+            self._display_thread.stop()
+            self._display_thread = None
 
     def get_frames(
         self,
@@ -586,7 +706,7 @@ class RgbdImages:
             markers_pos_tapir = self._run_tapir_tracker()
             self._distribute_pos_markers_tapir(markers_pos_tapir)
         for i, color in enumerate(self.color_cropped):
-            color_list.append(color.copy())
+            color_list.append(self._get_display_buf(i, color))
             self._partial_get_frame(
                 detect_blobs,
                 color_list,
@@ -614,28 +734,28 @@ class RgbdImages:
                     marker.reliability_index += 0.5
         markers_pos, markers_names, occlusions, reliability_idx = self.get_global_markers_pos()
         self.time_to_get_frame = (time.time() - tic) + _time_to_rotate
-        color = draw_markers(
-            self.color_frame,
-            markers_pos=markers_pos,
-            # markers_names=markers_names,
-            is_visible=occlusions,
-            scaling_factor=0.4,
-            circle_scaling_factor=2,
-            # markers_reliability_index=reliability_idx,
-            thickness=-1,
-        )
+        if self.show_images:
+            # the only consumer of the annotated full frame is the display window,
+            # so the copy + drawing pass is skipped entirely when running headless
+            color = draw_markers(
+                self.color_frame,
+                markers_pos=markers_pos,
+                # markers_names=markers_names,
+                is_visible=occlusions,
+                scaling_factor=0.4,
+                circle_scaling_factor=2,
+                # markers_reliability_index=reliability_idx,
+                thickness=-1,
+            )
         self.frame_idx += 1
         time_to_sleep = int(1 / self.conf_data["color_rate"] * 1000) - int(self.time_to_get_frame * 1000)
         if time_to_sleep <= 0:
             time_to_sleep = 1 if self.show_images else 0
-        if self.show_images:
-            cv2.namedWindow("color", cv2.WINDOW_NORMAL)
-            cv2.imshow("color", color)
-            # while cv2.waitKey(1) != ord('q'):q
-            cv2.waitKey(time_to_sleep)
-
-        else:
-            time.sleep(time_to_sleep / 1000)
+        if self.show_images and self.frame_idx % self.show_every == 0:
+            if self._display_thread is None:
+                self._display_thread = DisplayThread("color")
+            self._display_thread.show(color)
+        time.sleep(time_to_sleep / 1000)
         if self.save_data:
             markers_pos, markers_names, occlusions, reliability_idx = self.get_global_markers_pos()
             markers_in_meters, _, _, _ = self.get_global_markers_pos_in_meter(markers_pos)
@@ -753,6 +873,22 @@ class RgbdImages:
         markers_kalman = []
         dist_list = []
         _in_pixel = self.express_in_pixel(markers[:, :, 0])
+        # match every marker of a set against the blobs of its crop in one
+        # KD-tree query instead of one search per marker
+        _locals_by_set = []
+        _blob_matches = []
+        col = 0
+        for s in range(min(len(self.marker_sets), len(self.blobs))):
+            nb = self.marker_sets[s].nb_markers
+            local = np.column_stack(
+                (
+                    _in_pixel[0, col : col + nb] - self.start_crop[0][s],
+                    _in_pixel[1, col : col + nb] - self.start_crop[1][s],
+                )
+            )
+            _locals_by_set.append(local)
+            _blob_matches.append(find_closest_blobs(local, self.blobs[s], delta=8))
+            col += nb
         nb_past_markers = 0
         all_markers_local = []
         for i in range(markers.shape[1]):
@@ -768,14 +904,11 @@ class RgbdImages:
                     if idx == len(self.color_cropped):
                         break
                 continue
-            markers_local = np.array(
-                self.express_in_local(_in_pixel[:, i], [self.start_crop[0][idx], self.start_crop[1][idx]])
-            )
+            markers_local = _locals_by_set[idx][count]
             markers_kalman.append(markers_local)
-            blob_center, is_visible_tmp, dist = find_closest_blob(
-                markers_local, self.blobs[idx], delta=8, return_distance=True
-            )
-            dist_list.append(dist)
+            blob_center = _blob_matches[idx][0][count]
+            is_visible_tmp = bool(_blob_matches[idx][1][count])
+            dist_list.append(_blob_matches[idx][2][count])
             self.marker_sets[idx].markers[count].is_visible = is_visible_tmp
             all_markers_local.append(markers_local)
             if is_visible_tmp:
@@ -862,13 +995,9 @@ class RgbdImages:
         return color_list
 
     def _prepare_data_optical_flow(self, idx):
-        markers_pos_optical_flow = []
-        marker_names = []
-        for marker in self.marker_sets[idx].markers:
-            # if marker.is_visible:
-            markers_pos_optical_flow.append(list(marker.pos[:2]))
-            marker_names.append(marker.name)
-        return markers_pos_optical_flow, marker_names
+        # single gather from the contiguous marker-set array instead of one list per marker
+        markers_pos_optical_flow = np.array(self.marker_sets[idx].get_markers_pos()[:2].T, dtype=np.float32)
+        return markers_pos_optical_flow, self.marker_sets[idx].marker_names
 
     def _run_optical_flow(
         self,
@@ -1055,16 +1184,169 @@ class RgbdImages:
     def express_in_local(points, start_crop):
         return [points[0] - start_crop[0], points[1] - start_crop[1]]
 
+    @staticmethod
+    def _has_distortion(coeffs):
+        return coeffs is not None and np.any(np.asarray(coeffs))
+
+    def _get_rs_intrinsics(self, model, coeffs=None):
+        """
+        Get the rs.intrinsics object for the given distortion model.
+        The object is built once per model and cached, the cache is invalidated
+        when the intrinsics are set again.
+
+        Parameters
+        ----------
+        model :
+            rs.distortion model to use
+        coeffs : list
+            distortion coefficients to use with the model
+
+        Returns
+        -------
+        rs.intrinsics
+            intrinsics of the depth frame
+        """
+        key = str(model)
+        if key not in self._rs_intrinsics:
+            _intrinsics = rs.intrinsics()
+            _intrinsics.width = self.depth_frame.shape[1]
+            _intrinsics.height = self.depth_frame.shape[0]
+            _intrinsics.ppx = self.depth_ppx_ppy[0]
+            _intrinsics.ppy = self.depth_ppx_ppy[1]
+            _intrinsics.fx = self.depth_fx_fy[0]
+            _intrinsics.fy = self.depth_fx_fy[1]
+            _intrinsics.model = model
+            if coeffs is not None:
+                _intrinsics.coeffs = coeffs
+            self._rs_intrinsics[key] = _intrinsics
+        return self._rs_intrinsics[key]
+
+    def _project_points_to_pixels(self, marker_pos_in_meters):
+        """
+        Project points in meters to pixels using the intrinsics matrix (no distortion).
+
+        Parameters
+        ----------
+        marker_pos_in_meters : np.ndarray
+            position of the markers in meters (3, nb_markers)
+
+        Returns
+        -------
+        np.ndarray
+            position of the markers in pixels (3, nb_markers)
+        """
+        vecs = np.dot(self.intrinsics_depth_mat, marker_pos_in_meters)
+        markers_in_pixels = np.zeros_like(marker_pos_in_meters)
+        markers_in_pixels[:2] = vecs[:2] / vecs[2:3]
+        return markers_in_pixels
+
+    def _deproject_pixels_to_points(self, marker_pos_in_pixel):
+        """
+        Deproject pixels to points in meters using the intrinsics (no distortion).
+
+        Parameters
+        ----------
+        marker_pos_in_pixel : np.ndarray
+            position of the markers in pixels with depth on the last row (3, nb_markers)
+
+        Returns
+        -------
+        np.ndarray
+            position of the markers in meters (3, nb_markers)
+        """
+        depth = marker_pos_in_pixel[2]
+        markers_in_meters = np.zeros_like(marker_pos_in_pixel)
+        markers_in_meters[0] = (marker_pos_in_pixel[0] - self.depth_ppx_ppy[0]) * self.depth_inv_fx_fy[0] * depth
+        markers_in_meters[1] = (marker_pos_in_pixel[1] - self.depth_ppx_ppy[1]) * self.depth_inv_fx_fy[1] * depth
+        markers_in_meters[2] = depth
+        return markers_in_meters
+
+    def _precompute_deprojection_grid(self, height, width):
+        """
+        Precompute the normalized pixel grid (u - ppx) / fx and (v - ppy) / fy.
+        It depends only on the intrinsics, so it is computed once and reused for
+        every depth frame.
+        """
+        self._u_norm = ((np.arange(width) - self.depth_ppx_ppy[0]) * self.depth_inv_fx_fy[0]).astype(np.float32)
+        self._v_norm = ((np.arange(height) - self.depth_ppx_ppy[1]) * self.depth_inv_fx_fy[1]).astype(np.float32)
+
+    def deproject_depth_frame(self, depth):
+        """
+        Deproject a whole depth frame to a point cloud.
+
+        Parameters
+        ----------
+        depth : np.ndarray
+            depth frame in meters (height, width)
+
+        Returns
+        -------
+        np.ndarray
+            point cloud in meters (height, width, 3)
+        """
+        height, width = depth.shape
+        if self._u_norm is None or self._u_norm.shape[0] != width or self._v_norm.shape[0] != height:
+            self._precompute_deprojection_grid(height, width)
+        points = np.empty((height, width, 3), dtype=np.float32)
+        points[:, :, 0] = self._u_norm[np.newaxis, :] * depth
+        points[:, :, 1] = self._v_norm[:, np.newaxis] * depth
+        points[:, :, 2] = depth
+        return points
+
+    def project_batch(self, marker_pos_in_meters):
+        """
+        Project a whole set of points in meters to pixels in one call.
+
+        Parameters
+        ----------
+        marker_pos_in_meters : np.ndarray
+            position of the markers in meters (3, nb_markers)
+
+        Returns
+        -------
+        tuple
+            position of the markers in pixels (2, nb_markers) and a boolean
+            validity mask (nb_markers,) which is True for points in front of
+            the camera and inside the frame bounds
+        """
+        markers_in_pixels = self.express_in_pixel(marker_pos_in_meters)
+        valid = marker_pos_in_meters[2] > 0
+        if self.depth_frame is not None:
+            valid = (
+                valid
+                & (markers_in_pixels[0] >= 0)
+                & (markers_in_pixels[0] < self.depth_frame.shape[1])
+                & (markers_in_pixels[1] >= 0)
+                & (markers_in_pixels[1] < self.depth_frame.shape[0])
+            )
+        return markers_in_pixels[:2], valid
+
+    def deproject_batch(self, marker_pos_in_pixel, depth):
+        """
+        Deproject a whole set of pixels to points in meters in one call.
+
+        Parameters
+        ----------
+        marker_pos_in_pixel : np.ndarray
+            position of the markers in pixels (2, nb_markers)
+        depth : np.ndarray
+            depth of the markers in meters (nb_markers,)
+
+        Returns
+        -------
+        np.ndarray
+            position of the markers in meters (3, nb_markers)
+        """
+        stacked = np.vstack((np.asarray(marker_pos_in_pixel)[:2], np.asarray(depth)[np.newaxis]))
+        markers_in_meters, _, _, _ = self.get_global_markers_pos_in_meter(stacked)
+        return markers_in_meters
+
     def express_in_pixel(self, marker_pos_in_meters):
-        _intrinsics = rs.intrinsics()
-        _intrinsics.width = self.depth_frame.shape[1]
-        _intrinsics.height = self.depth_frame.shape[0]
-        _intrinsics.ppx = self.depth_ppx_ppy[0]
-        _intrinsics.ppy = self.depth_ppx_ppy[1]
-        _intrinsics.fx = self.depth_fx_fy[0]
-        _intrinsics.fy = self.depth_fx_fy[1]
-        _intrinsics.model = rs.distortion.inverse_brown_conrady
-        _intrinsics.coeffs = self.conf_data["dist_coeffs_color"]
+        if not self._has_distortion(self.conf_data["dist_coeffs_color"]):
+            return self._project_points_to_pixels(marker_pos_in_meters)
+        _intrinsics = self._get_rs_intrinsics(
+            rs.distortion.inverse_brown_conrady, self.conf_data["dist_coeffs_color"]
+        )
 
         markers_in_pixels = np.zeros_like(marker_pos_in_meters)
         for m in range(marker_pos_in_meters.shape[1]):
@@ -1143,17 +1425,12 @@ class RgbdImages:
                 .as_video_stream_profile()
                 .get_intrinsics()
             )
+        elif not self._has_distortion(self.conf_data["dist_coeffs_color"]):
+            return self._deproject_pixels_to_points(marker_pos_in_pixel), markers_names, occlusions
         else:
-            _intrinsics = rs.intrinsics()
-            _intrinsics.width = self.depth_frame.shape[1]
-            _intrinsics.height = self.depth_frame.shape[0]
-            _intrinsics.ppx = self.depth_ppx_ppy[0]
-            _intrinsics.ppy = self.depth_ppx_ppy[1]
-            _intrinsics.fx = self.depth_fx_fy[0]
-            _intrinsics.fy = self.depth_fx_fy[1]
-            _intrinsics.model = rs.distortion.inverse_brown_conrady
-            _intrinsics.coeffs = self.conf_data["dist_coeffs_color"]
-            # _intrinsics.model = rs.distortion.none
+            _intrinsics = self._get_rs_intrinsics(
+                rs.distortion.inverse_brown_conrady, self.conf_data["dist_coeffs_color"]
+            )
 
         markers_in_meters = np.zeros_like(marker_pos_in_pixel)
         for m in range(marker_pos_in_pixel.shape[1]):
@@ -1177,14 +1454,8 @@ class RgbdImages:
                 .get_intrinsics()
             )
         else:
-            _intrinsics = rs.intrinsics()
-            _intrinsics.width = self.depth_frame.shape[1]
-            _intrinsics.height = self.depth_frame.shape[0]
-            _intrinsics.ppx = self.depth_ppx_ppy[0]
-            _intrinsics.ppy = self.depth_ppx_ppy[1]
-            _intrinsics.fx = self.depth_fx_fy[0]
-            _intrinsics.fy = self.depth_fx_fy[1]
-            _intrinsics.model = rs.distortion.none
+            # distortion model is none here: the pinhole formulas match rs2_deproject_pixel_to_point
+            return self._deproject_pixels_to_points(marker_pos_in_pixel), markers_names, occlusions, reliability
 
         markers_in_meters = np.zeros_like(marker_pos_in_pixel)
         for m in range(marker_pos_in_pixel.shape[1]):
@@ -1592,15 +1863,10 @@ class RgbdImages:
         :param pos_markers_dic: dictionary of markers
         :return: list of markers
         """
-        markers = np.zeros((3, len(self.first_frame_markers[i].keys())))
-        occlusion = []
-        depth_occlusion = []
-        c = 0
-        for key in self.first_frame_markers[i].keys():
-            markers[:, c] = np.array(self.first_frame_markers[i][key][0], dtype=float)
-            occlusion.append(self.first_frame_markers[i][key][1])
-            depth_occlusion.append(self.first_frame_markers[i][key][2])
-            c += 1
+        frame_markers = list(self.first_frame_markers[i].values())
+        markers = np.array([marker[0] for marker in frame_markers], dtype=float).T
+        occlusion = [marker[1] for marker in frame_markers]
+        depth_occlusion = [marker[2] for marker in frame_markers]
         self.last_pos[i] = markers[:2, :].T.tolist()
         self.marker_sets[i].set_markers_pos(markers)
         self.marker_sets[i].init_kalman(markers)
@@ -0,0 +1,65 @@
+import numpy as np
+
+try:
+    from numba import njit
+except ModuleNotFoundError:
+    njit = None
+
+
+def closest_node_with_distance(point, nodes):
+    """
+    Find the node closest to the point (generic numpy version, any dimension).
+
+    Parameters
+    ----------
+    point : np.ndarray
+        point to compare (n_dim,)
+    nodes : np.ndarray
+        nodes to search (nb_nodes, n_dim)
+
+    Returns
+    -------
+    tuple
+        index of the closest node and its distance to the point
+    """
+    deltas = nodes - point
+    dist_2 = np.einsum("ij,ij->i", deltas, deltas)
+    idx = int(np.argmin(dist_2))
+    return idx, float(np.sqrt(dist_2[idx]))
+
+
+if njit is not None:
+    # the searches always run on 2d (pixel) or 3d (meter) points, so the kernels
+    # are specialized per dimension with the axis loop unrolled by hand; numba
+    # compiles one monomorphic version of each and caches it on disk
+
+    @njit(cache=True)
+    def closest_node_with_distance_2d(point, nodes):
+        best_idx = -1
+        best_dist = np.inf
+        for n in range(nodes.shape[0]):
+            dx = nodes[n, 0] - point[0]
+            dy = nodes[n, 1] - point[1]
+            dist = dx * dx + dy * dy
+            if dist < best_dist:
+                best_dist = dist
+                best_idx = n
+        return best_idx, np.sqrt(best_dist)
+
+    @njit(cache=True)
+    def closest_node_with_distance_3d(point, nodes):
+        best_idx = -1
+        best_dist = np.inf
+        for n in range(nodes.shape[0]):
+            dx = nodes[n, 0] - point[0]
+            dy = nodes[n, 1] - point[1]
+            dz = nodes[n, 2] - point[2]
+            dist = dx * dx + dy * dy + dz * dz
+            if dist < best_dist:
+                best_dist = dist
+                best_idx = n
+        return best_idx, np.sqrt(best_dist)
+
+else:
+    closest_node_with_distance_2d = closest_node_with_distance
+    closest_node_with_distance_3d = closest_node_with_distance
@@ -0,0 +1,73 @@
+import queue
+import threading
+
+import cv2
+
+
+class DisplayThread:
+    """
+    Show frames in a background thread so that cv2.imshow and cv2.waitKey do not
+    block the tracking loop. The queue keeps only the most recent frame: when the
+    producer is faster than the window server, older frames are dropped.
+    """
+
+    def __init__(self, window_name: str = "color"):
+        self.window_name = window_name
+        self._queue = queue.Queue(maxsize=1)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._started = False
+        self._stopped = False
+
+    def show(self, frame):
+        """
+        Queue a frame for display, replacing the pending one if the consumer
+        has not caught up yet.
+        """
+        if self._stopped:
+            return
+        if not self._started:
+            self._started = True
+            self._thread.start()
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(frame)
+            except queue.Full:
+                pass
+
+    def stop(self):
+        """
+        Ask the display thread to close its window and wait for it to exit.
+        The window is destroyed from the display thread itself, as highgui is
+        not safe to call from two threads at once.
+        """
+        if self._stopped:
+            return
+        self._stopped = True
+        if not self._started:
+            return
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                break
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+        self._thread.join()
+
+    def _run(self):
+        cv2.namedWindow(self.window_name, cv2.WINDOW_NORMAL)
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            cv2.imshow(self.window_name, frame)
+            cv2.waitKey(1)
+        cv2.destroyWindow(self.window_name)
@@ -56,7 +56,7 @@ class Marker:
         self.kalman.transitionMatrix[1, 3] = self.dt
         for i in range(0, self.n_measures):
             self.kalman.measurementMatrix[i, self.Measurement_array[i]] = 1
-        self.pos = np.array(points)
+        self.pos[:] = points
 
         input_points = np.float32(np.ndarray.flatten(points))
         self.kalman.statePre = np.array([input_points[0], input_points[1], 0, 0], dtype=np.float32)
@@ -132,7 +132,7 @@ class Marker3D:
         self.kalman.transitionMatrix[2, 4] = self.dt
         for i in range(0, self.n_measures):
             self.kalman.measurementMatrix[i, self.Measurement_array[i]] = 1
-        self.pos = np.array(points)
+        self.pos[:] = points
         input_points = np.float32(np.ndarray.flatten(points))
         self.kalman.statePre = np.array([input_points[0], input_points[1], input_points[2], 0, 0, 0], dtype=np.float32)
         self.kalman.statePost = np.array([input_points[0], input_points[1], input_points[2], 0, 0, 0], dtype=np.float32)
@@ -178,6 +178,12 @@ class MarkerSet:
             marker.dt = 1 / fps
             self.markers.append(marker)
         self.nb_markers = len(marker_names)
+        # positions are backed by a single contiguous array, each marker holds a view
+        # on its row so the per-marker API still works while whole-set reads and
+        # writes are a single array op
+        self._pos = np.zeros((self.nb_markers, 3))
+        for m, marker in enumerate(self.markers):
+            marker.pos = self._pos[m]
         self.image_idx = image_idx
         self.marker_names = marker_names
         self.marker_set_model = None
@@ -192,7 +198,7 @@ class MarkerSet:
         np.ndarray
             position of the markers
         """
-        return np.array([marker.pos for marker in self.markers]).T.reshape(3, self.nb_markers)
+        return self._pos.T
 
     def get_markers_reliability_index(self, frame_idx):
         return list(np.array([marker.get_reliability_index(frame_idx) for marker in self.markers]).round(2))
@@ -261,8 +267,7 @@ class MarkerSet:
         pos : np.ndarray
             position of the markers
         """
-        for m, marker in enumerate(self.markers):
-            marker.pos = pos[:, m]
+        self._pos[:] = np.asarray(pos).T
 
     def set_filtered_markers_pos(self, pos):
         """
@@ -379,6 +384,70 @@ class MarkerSet:
     def init_kalman(self, points):
         for m, mark in enumerate(self.markers):
             mark.init_kalman(points[:, m])
+        self._init_batch_kalman()
+
+    def _init_batch_kalman(self):
+        """
+        Pack the per-marker kalman filters in (nb_markers, ...) arrays so the whole
+        set can be predicted/corrected with batched matrix ops. The matrices are
+        read from the cv2 filters so both formulations stay identical; the batch
+        methods are an alternative to calling the per-marker filters in a loop,
+        not meant to be mixed with them.
+        """
+        kalman = self.markers[0].kalman
+        self._kf_F = np.array(kalman.transitionMatrix)
+        self._kf_H = np.array(kalman.measurementMatrix)
+        self._kf_Q = np.array(kalman.processNoiseCov)
+        self._kf_R = np.array(kalman.measurementNoiseCov)
+        self._kf_x = np.array([marker.kalman.statePost.reshape(-1) for marker in self.markers])
+        self._kf_P = np.array([marker.kalman.errorCovPost for marker in self.markers])
+
+    def batch_kalman_predict(self):
+        """
+        Predict all the marker filters in one batched update.
+
+        Returns
+        -------
+        np.ndarray
+            predicted measurements (nb_markers, n_measures)
+        """
+        self._kf_x = self._kf_x @ self._kf_F.T
+        self._kf_P = np.einsum("ij,mjk,lk->mil", self._kf_F, self._kf_P, self._kf_F) + self._kf_Q
+        return self._kf_x @ self._kf_H.T
+
+    def batch_kalman_correct(self, positions, visible_mask=None):
+        """
+        Correct all the marker filters with one batched update.
+
+        Parameters
+        ----------
+        positions : np.ndarray
+            measured positions (nb_markers, n_measures)
+        visible_mask : np.ndarray
+            boolean mask (nb_markers,), only the filters of visible markers are
+            corrected; all markers are corrected when None
+
+        Returns
+        -------
+        np.ndarray
+            corrected measurement estimates (nb_markers, n_measures)
+        """
+        z = np.asarray(positions, dtype=np.float32)
+        if visible_mask is None:
+            mask = np.ones(len(z), dtype=bool)
+        else:
+            mask = np.asarray(visible_mask, dtype=bool)
+        y = z - self._kf_x @ self._kf_H.T
+        p_ht = np.einsum("mij,kj->mik", self._kf_P, self._kf_H)
+        s = np.einsum("ij,mjk->mik", self._kf_H, p_ht) + self._kf_R
+        gain = p_ht @ np.linalg.inv(s)
+        x_new = self._kf_x + np.einsum("mij,mj->mi", gain, y)
+        p_new = self._kf_P - np.einsum("mij,jk,mkl->mil", gain, self._kf_H, self._kf_P)
+        self._kf_x[mask] = x_new[mask]
+        self._kf_P[mask] = p_new[mask]
+        # same side effect as Marker.correct_from_kalman: the stored position is the measurement
+        self._pos[mask, : z.shape[1]] = z[mask]
+        return self._kf_x @ self._kf_H.T
 
     def init_filtered_pos(self, points: np.ndarray) -> None:
         """
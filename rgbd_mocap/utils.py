@@ -1,5 +1,6 @@
 import numpy as np
 from scipy.optimize import minimize_scalar
+from scipy.spatial import cKDTree
 import cv2
 import ezc3d
 
@@ -8,6 +9,7 @@ try:
 except ModuleNotFoundError:
     pass
 from .enums import *
+from ._kernels import closest_node_with_distance_2d, closest_node_with_distance_3d
 import json
 import math
 
@@ -154,6 +156,32 @@ def convert_select_points_to_query_points(frame, points):
     return query_points
 
 
+def aligned_empty(shape, dtype, align=64):
+    """
+    Allocate an uninitialized array whose first byte is aligned to `align` bytes,
+    so that OpenCV and the jitted kernels can use aligned vector loads on it.
+
+    Parameters
+    ----------
+    shape : tuple
+        shape of the array
+    dtype :
+        dtype of the array
+    align : int
+        alignment of the first byte in bytes
+
+    Returns
+    -------
+    np.ndarray
+        contiguous aligned array
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    buffer = np.empty(nbytes + align, dtype=np.uint8)
+    offset = (-buffer.ctypes.data) % align
+    return buffer[offset : offset + nbytes].view(dtype).reshape(shape)
+
+
 def closest_node(node, nodes):
     deltas = nodes - node
     dist_2 = np.einsum("ij,ij->i", deltas, deltas)
@@ -181,38 +209,28 @@ def start_idx_from_json(json_file):
 
 
 def find_closest_node(point, node_list):
-    closest_node = None
-    smallest_distance = float("inf")
-    for node in node_list:
-        try:
-            distance = math.sqrt((node[0] - point[0]) ** 2 + (node[1] - point[1]) ** 2)
-        except ValueError:
-            print("point", point)
-            print("node", node)
-            raise ValueError
-        if distance < smallest_distance:
-            closest_node = node
-            smallest_distance = distance
-    if closest_node is not None:
-        return closest_node[0], closest_node[1], smallest_distance
-    else:
+    if len(node_list) == 0:
         return None, None, None
+    try:
+        nodes = np.asarray(node_list, dtype=np.float64)[:, :2]
+        point = np.asarray(point, dtype=np.float64)[:2]
+    except (TypeError, ValueError):
+        print("point", point)
+        print("node", node_list)
+        raise ValueError
+    idx, smallest_distance = closest_node_with_distance_2d(point, nodes)
+    closest_node = node_list[idx]
+    return closest_node[0], closest_node[1], smallest_distance
 
 
 def find_closest_node_3d(point, node_list):
-    closest_node = None
-    smallest_distance = float("inf")
-    idx = 0
-    for n, node in enumerate(node_list):
-        distance = math.sqrt((node[0] - point[0]) ** 2 + (node[1] - point[1]) ** 2 + (node[2] - point[2]) ** 2)
-        if distance < smallest_distance:
-            closest_node = node
-            smallest_distance = distance
-            idx = n
-    if closest_node is not None:
-        return closest_node[0], closest_node[1], closest_node[2], smallest_distance, idx
-    else:
+    if len(node_list) == 0:
         return None, None, None
+    nodes = np.asarray(node_list, dtype=np.float64)[:, :3]
+    point = np.asarray(point, dtype=np.float64)[:3]
+    idx, smallest_distance = closest_node_with_distance_3d(point, nodes)
+    closest_node = node_list[idx]
+    return closest_node[0], closest_node[1], closest_node[2], smallest_distance, idx
 
 
 def find_closest_blob(center, blobs, delta=10, return_distance=False):
@@ -244,6 +262,37 @@ def find_closest_blob(center, blobs, delta=10, return_distance=False):
             return center, False
 
 
+def find_closest_blobs(centers, blobs, delta=10):
+    """
+    Find the closest blob for every center in a single KD-tree query instead of
+    one search per center.
+
+    Parameters
+    ----------
+    centers : np.ndarray
+        centers to match (nb_centers, 2)
+    blobs : list
+        blob centers to search
+    delta : int
+        maximum distance for a blob to be considered a match
+
+    Returns
+    -------
+    tuple
+        matched centers (nb_centers, 2), boolean visibility (nb_centers,) and
+        distances (nb_centers,) with np.inf where no blob is within delta
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    final_centers = centers.copy()
+    if len(blobs) == 0:
+        return final_centers, np.zeros(len(centers), dtype=bool), np.full(len(centers), np.inf)
+    blobs_arr = np.asarray(blobs, dtype=np.float64)[:, :2]
+    distances, idx = cKDTree(blobs_arr).query(centers, distance_upper_bound=delta)
+    is_visible = np.isfinite(distances)
+    final_centers[is_visible] = blobs_arr[idx[is_visible]]
+    return final_centers, is_visible, distances
+
+
 def find_closest_blob_3D(center, blobs, delta=10, return_distance=False):
     """
     Find the closest blob to the center
@@ -433,6 +482,43 @@ def merge_cluster(blobs, threshold_distance=5.0):
     return current_contours
 
 
+try:
+    _N_CUDA_DEVICES = cv2.cuda.getCudaEnabledDeviceCount()
+except (AttributeError, cv2.error):
+    _N_CUDA_DEVICES = 0
+
+
+def _get_blobs_cuda(im_from, params, image_bounds):
+    """
+    Detect blob centroids with the threshold running on the GPU and connected
+    components on the downloaded mask. Only the area filter of the CPU detector
+    is applied; circularity/convexity are skipped on this path.
+
+    Returns
+    -------
+    tuple
+        list of (cx, cy) centroids in the bounded frame and the same centroids
+        expressed in the full frame
+    """
+    # keep dark pixels when the config looks for dark markers, like the CPU
+    # detector does through params_detector.blobColor
+    thresh_type = cv2.THRESH_BINARY if params.get("blob_color", 255) != 0 else cv2.THRESH_BINARY_INV
+    gpu_frame = cv2.cuda_GpuMat()
+    gpu_frame.upload(im_from)
+    _, gpu_mask = cv2.cuda.threshold(gpu_frame, params["min_threshold"], 255, thresh_type)
+    mask = gpu_mask.download().astype(np.uint8)
+    nb_labels, _, stats, centroids = cv2.connectedComponentsWithStats(mask)
+    blobs = []
+    centers = []
+    for label in range(1, nb_labels):
+        area = stats[label, cv2.CC_STAT_AREA]
+        if params["min_area"] <= area <= params["max_area"]:
+            cx, cy = centroids[label]
+            blobs.append((cx, cy))
+            centers.append((int(cx + image_bounds[0]), int(cy + image_bounds[2])))
+    return blobs, centers
+
+
 def find_closest_markers_in_model(marker_to_check, markers_model, same_idx, model):
     center, _, idx = find_closest_blob_3D(marker_to_check, markers_model[:, :, 0].T, delta=5)
     return idx
@@ -449,6 +535,7 @@ def get_blobs(
     depth=None,
     clipping_color=None,
     depth_scale=None,
+    use_cuda_blob_detection=False,
 ):
     if image_bounds:
         bounded_frame = frame.copy()
@@ -535,7 +622,13 @@ def get_blobs(
                             centers.append((cx, cy))
                         blobs.append(c)
 
-        if method == DetectionMethod.CV2Blobs:
+        if method == DetectionMethod.CV2Blobs and use_cuda_blob_detection and _N_CUDA_DEVICES > 0:
+            blobs_tmp, centers_tmp = _get_blobs_cuda(im_from, params, image_bounds)
+            blobs += blobs_tmp
+            if return_centers:
+                centers += centers_tmp
+
+        elif method == DetectionMethod.CV2Blobs:
             params_detector = cv2.SimpleBlobDetector_Params()
             params_detector.minThreshold = params["min_threshold"]
             params_detector.maxThreshold = params["max_threshold"]
@@ -656,25 +749,30 @@ def draw_markers(
     markers_reliability_index=None,
     thickness=1,
     color=None,
+    inplace=False,
 ):
-    frame = frame.copy()
+    if not inplace:
+        frame = frame.copy()
     try:
         markers_pos.shape[1]
     except IndexError:
         pass
     is_visible = np.ones(markers_pos.shape[1], dtype=bool) if is_visible is None else is_visible
     if markers_pos is not None:
+        markers_pos = np.asarray(markers_pos, dtype=float)
+        is_finite = np.isfinite(markers_pos[0]) & np.isfinite(markers_pos[1])
+        pos_int = np.where(is_finite, markers_pos[:2], 0).astype(int)
         for i in range(markers_pos.shape[1]):
             x, y = None, None
-            if np.isfinite(markers_pos[0, i]) and np.isfinite(markers_pos[1, i]):
+            if is_finite[i]:
                 if not color:
                     color_tmp = (0, 255, 0) if bool(is_visible[i]) else (0, 0, 255)
                 else:
                     color_tmp = color
-                x, y = int(markers_pos[0, i]), int(markers_pos[1, i])
+                x, y = pos_int[0, i], pos_int[1, i]
                 frame = cv2.circle(
                     frame,
-                    (int(markers_pos[0, i]), int(markers_pos[1, i])),
+                    (x, y),
                     int(circle_scaling_factor),
                     color_tmp,
                     thickness,
@@ -713,6 +811,37 @@ def draw_markers(
     return frame
 
 
+def draw_overlays(
+    frame,
+    markers_pos=None,
+    markers_names=None,
+    is_visible=None,
+    markers_reliability_index=None,
+    blobs=None,
+    scaling_factor=1.0,
+    circle_scaling_factor=5,
+    blob_color=(255, 0, 0),
+):
+    """
+    Stamp the markers and the blobs on the frame in a single in-place pass,
+    so the caller copies the frame at most once instead of once per overlay.
+    """
+    if markers_pos is not None:
+        draw_markers(
+            frame,
+            markers_pos=markers_pos,
+            markers_names=markers_names,
+            is_visible=is_visible,
+            scaling_factor=scaling_factor,
+            circle_scaling_factor=circle_scaling_factor,
+            markers_reliability_index=markers_reliability_index,
+            inplace=True,
+        )
+    if blobs is not None and len(blobs) != 0:
+        draw_blobs(frame, blobs, color=blob_color)
+    return frame
+
+
 def ortho_norm_basis(vector, idx):
     # build an orthogonal basis fom a vector
     basis = []